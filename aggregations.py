@@ -0,0 +1,95 @@
+"""
+Filtering and aggregation for the Bikeroom dashboards.
+
+Charts are fed small pre-aggregated frames rather than filtered rows, so
+grouping happens on the server and only a handful of rows reach the browser.
+Streamlit re-executes the app script on every rerun, but this module is
+imported once per process, so the memoized aggregate() is shared across
+reruns and sessions.
+"""
+from functools import lru_cache
+
+import pandas as pd
+import numpy as np
+from numba import njit
+
+from data import mock_sales
+
+# Serial on purpose: Streamlit runs the script on a worker thread, where numba's
+# parallel threading layer can hang the process at exit, and at this data size
+# a thread pool would only add startup cost.
+@njit(cache=True)
+def _filter_mask(codes, prices, selected_codes, min_price, out):
+    """Fused category-membership and minimum-price mask, written into `out`."""
+    for i in range(codes.size):
+        code = codes[i]
+        hit = False
+        for selected in selected_codes:
+            if selected == code:
+                hit = True
+                break
+        out[i] = hit and prices[i] >= min_price
+
+def filter_sales(df, categories, min_price):
+    """Applies the sidebar filters to the granular sales data."""
+    # Evaluate both conditions in one pass over the integer category codes
+    # instead of building two intermediate boolean Series.
+    category = df['Category'].cat
+    selected_codes = np.sort(category.categories.get_indexer(list(categories)))
+    mask = np.empty(len(df), dtype=np.bool_)
+    _filter_mask(category.codes.to_numpy(), df['Price_USD'].to_numpy(), selected_codes, min_price, mask)
+    return df.iloc[np.flatnonzero(mask)]
+
+def _sum_by_category(df, key, value):
+    """
+    Sums `value` per category of the categorical `key` column with np.bincount on the codes.
+    Only categories present in `df` are returned, matching groupby(..., observed=True).
+    """
+    column = df[key].cat
+    num_categories = len(column.categories)
+    codes = column.codes.to_numpy()
+    totals = np.bincount(codes, weights=df[value].to_numpy(), minlength=num_categories)
+    observed = np.bincount(codes, minlength=num_categories) > 0
+    totals = totals[observed]
+    if np.issubdtype(df[value].dtype, np.integer):
+        # bincount weights are float64; widen integer sums like pandas does
+        totals = totals.astype(np.int64)
+    return pd.DataFrame({
+        key: pd.Categorical(column.categories[observed], categories=column.categories),
+        value: totals,
+    })
+
+def compute_price_trend(filtered):
+    """Monthly average price per unit for each category."""
+    # A single groupby on (month, category) avoids resampling each category separately
+    price_trend = filtered.groupby(
+        [pd.Grouper(key='Date', freq='ME'), 'Category'], observed=True
+    )['Price_USD'].mean().reset_index()
+    return price_trend.rename(columns={'Price_USD': 'Avg_Price'})
+
+def compute_units_by_category(filtered):
+    """Total units sold per category."""
+    return _sum_by_category(filtered, 'Category', 'Units_Sold')
+
+def compute_revenue_by_region(filtered):
+    """Total revenue per region."""
+    return _sum_by_category(filtered, 'Region', 'Total_Sales_USD')
+
+@lru_cache(maxsize=128)
+def aggregate(categories, min_price):
+    """
+    Filtered rows, price trend, units by category and revenue by region for one filter state.
+    `categories` must be hashable (a frozenset); the returned frames are shared
+    between callers and must not be modified.
+
+    The memo is separate from Streamlit's cache and survives "Clear cache".
+    That is safe because mock_sales() is seeded and always yields the same frame;
+    call aggregate.cache_clear() if the source data can ever change.
+    """
+    filtered = filter_sales(mock_sales(), categories, min_price)
+    return (
+        filtered,
+        compute_price_trend(filtered),
+        compute_units_by_category(filtered),
+        compute_revenue_by_region(filtered),
+    )
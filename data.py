@@ -0,0 +1,129 @@
+"""
+Shared mock data for the Bikeroom dashboards.
+
+Keeping the generator in one module means every page of a multipage app hits
+the same st.cache_data entry instead of building its own copy of the frame.
+"""
+import os
+import tempfile
+from pathlib import Path
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+# Generated frames are persisted next to this module so a restarted worker
+# can reload them instead of regenerating. Bump DATA_VERSION whenever the
+# generated layout changes so stale files are not picked up.
+DATA_DIR = Path(__file__).parent
+DATA_VERSION = 2
+
+@st.cache_data
+def mock_sales(num_rows=1000, seed=0):
+    """
+    Loads the mock sales frame from its parquet file, generating and saving it on first use.
+    """
+    path = DATA_DIR / f"mock_sales_v{DATA_VERSION}_{num_rows}_{seed}.parquet"
+    if path.exists():
+        try:
+            return pd.read_parquet(path, engine="pyarrow", memory_map=True)
+        except Exception:
+            # Corrupt or unreadable file: regenerate and overwrite it below
+            pass
+
+    granular_df = _generate_sales(num_rows, seed)
+    _write_parquet(granular_df, path)
+    return granular_df
+
+@st.cache_data
+def price_bounds(num_rows=1000, seed=0):
+    """
+    Min and max Price_USD of the mock_sales(num_rows, seed) frame.
+    Keyed on the dataset parameters so a rerun never hashes or rescans the frame.
+    """
+    prices = mock_sales(num_rows, seed)['Price_USD']
+    return float(prices.min()), float(prices.max())
+
+@st.cache_resource
+def kpi_lookup(num_rows=1000, seed=0):
+    """
+    Per-category prices sorted ascending, with suffix sums of revenue and units.
+    The suffix sums end in a trailing zero so an index past the last price reads as empty.
+    Held as a shared resource (not copied per hit) and keyed on the dataset parameters;
+    callers must treat the arrays as read-only.
+    """
+    lookup = {}
+    for category, group in mock_sales(num_rows, seed).groupby('Category', observed=True):
+        order = np.argsort(group['Price_USD'].to_numpy(), kind='stable')
+        prices = group['Price_USD'].to_numpy()[order]
+        revenue = group['Total_Sales_USD'].to_numpy()[order].astype(np.float64)
+        units = group['Units_Sold'].to_numpy()[order].astype(np.int64)
+        lookup[category] = (
+            prices,
+            np.append(revenue[::-1].cumsum()[::-1], 0.0),
+            np.append(units[::-1].cumsum()[::-1], 0),
+        )
+    return lookup
+
+def _write_parquet(df, path):
+    """
+    Writes `df` to a temp file in the target directory and renames it into place,
+    so concurrent readers never see a partially written file.
+    """
+    try:
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    except OSError:
+        # Read-only checkout: fall back to the in-memory cache only
+        return
+    os.close(fd)
+    try:
+        df.to_parquet(tmp_name, engine="pyarrow", compression="zstd")
+        os.replace(tmp_name, path)
+    except OSError:
+        pass
+    finally:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+
+# --- Data Generation Function (Mock Data) ---
+def _generate_sales(num_rows, seed):
+    """
+    Generates mock bike sales data (Granular).
+    We keep the date and price for each transaction to enable time-series analysis.
+    A fixed seed makes the output (and therefore the cache entry) identical across deploys.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Define data fields
+    models = ['Speedster 3000', 'Trail King Pro', 'City Commuter E-3', 'Gravel Explorer', 'Aero Blade Race']
+    categories = ['Road', 'Mountain', 'City', 'Electric', 'BMX']
+    regions = ['North America', 'Europe', 'Asia', 'Oceania']
+    
+    data = {
+        # Sample each categorical column in a single vectorized call.
+        # Categorical dtype lets groupby/isin work on small integer codes instead of strings.
+        'Bike_Model': pd.Categorical(rng.choice(models, size=num_rows, p=[0.25, 0.20, 0.30, 0.15, 0.10]), categories=models),
+        'Category': pd.Categorical(rng.choice(categories, size=num_rows), categories=categories),
+        # Price is generated with noise to simulate fluctuations over time
+        'Price_USD': np.round(rng.normal(loc=1800, scale=700, size=num_rows), -1).clip(500, 6000),
+        'Units_Sold': rng.integers(1, 50, num_rows),
+        'Region': pd.Categorical(rng.choice(regions, size=num_rows), categories=regions),
+        # Distribute sales randomly across the year
+        'Date': pd.to_datetime('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, num_rows), unit='D')
+    }
+    
+    granular_df = pd.DataFrame(data)
+    # Prices are clipped to [500, 6000] and units to [1, 49], so narrower dtypes
+    # are exact and halve the bytes read by every filter and aggregation.
+    # Columns stay NumPy-backed (not pyarrow) so the Numba filter reads them zero-copy.
+    granular_df['Price_USD'] = granular_df['Price_USD'].astype(np.float32)
+    granular_df['Units_Sold'] = granular_df['Units_Sold'].astype(np.int16)
+    # Multiply straight into a float32 buffer instead of allocating a product and then casting it
+    total_sales = np.empty(num_rows, dtype=np.float32)
+    np.multiply(granular_df['Price_USD'].to_numpy(), granular_df['Units_Sold'].to_numpy(), out=total_sales)
+    granular_df['Total_Sales_USD'] = total_sales
+    
+    # Sort by category, then date, so each category's rows are contiguous and
+    # time-ordered for the per-category monthly reduction
+    granular_df.sort_values(['Category', 'Date'], inplace=True)
+    return granular_df
@@ -1,8 +1,11 @@
+import html
+import math
+
 import streamlit as st
-import pandas as pd
 import numpy as np
-import altair as alt
-import random
+
+from aggregations import aggregate
+from data import kpi_lookup, mock_sales, price_bounds
 
 # --- Configuration ---
 st.set_page_config(
@@ -11,40 +14,164 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# --- Data Generation Function (Mock Data) ---
-@st.cache_data
-def load_data():
+def compute_kpis(lookup, categories, min_price):
+    """Total revenue, units and transaction count via one binary search per selected category."""
+    total_revenue, total_units, num_transactions = 0.0, 0, 0
+    for category in categories:
+        if category not in lookup:
+            continue
+        prices, revenue, units = lookup[category]
+        start = np.searchsorted(prices, min_price, side='left')
+        total_revenue += revenue[start]
+        total_units += units[start]
+        num_transactions += prices.size - start
+    return total_revenue, total_units, num_transactions
+
+# --- Chart Specs (Vega-Lite) ---
+# The chart templates are static, so they are written as plain Vega-Lite dicts
+# instead of being rebuilt (and schema-validated) through Altair on every rerun.
+# Only the data changes; it is passed separately to st.vega_lite_chart.
+PRICE_TREND_SPEC = {
+    "title": "Average Monthly Price Trend",
+    "mark": {"type": "line", "point": True},
+    "encoding": {
+        "x": {"field": "Date", "type": "temporal", "axis": {"title": "Date", "format": "%Y-%m"}},
+        "y": {"field": "Avg_Price", "type": "quantitative", "axis": {"title": "Average Price (USD)", "format": "$,.0f"}},
+        "color": {"field": "Category", "type": "nominal"},
+        "tooltip": [
+            {"field": "Date", "type": "temporal"},
+            {"field": "Category", "type": "nominal"},
+            {"field": "Avg_Price", "type": "quantitative", "format": "$,.2f"},
+        ],
+    },
+    # Interval selection bound to scales (zoom/pan)
+    "params": [{"name": "price_zoom", "select": "interval", "bind": "scales"}],
+}
+
+UNITS_BY_CATEGORY_SPEC = {
+    "height": 300,
+    "mark": "bar",
+    "encoding": {
+        "x": {"field": "Category", "type": "nominal", "sort": "-y"},
+        "y": {"field": "Units_Sold", "type": "quantitative", "title": "Total Units Sold"},
+        "tooltip": [
+            {"field": "Category", "type": "nominal"},
+            {"field": "Units_Sold", "type": "quantitative"},
+        ],
+    },
+    "params": [{"name": "units_zoom", "select": "interval", "bind": "scales"}],
+}
+
+REVENUE_BY_REGION_SPEC = {
+    "title": "Revenue Share by Region",
+    "mark": {"type": "arc", "outerRadius": 120, "innerRadius": 50},
+    "encoding": {
+        "theta": {"field": "Total_Sales_USD", "type": "quantitative", "stack": True},
+        "color": {"field": "Region", "type": "nominal"},
+        "order": {"field": "Total_Sales_USD", "type": "quantitative", "sort": "descending"},
+        "tooltip": [
+            {"field": "Region", "type": "nominal"},
+            {"field": "Total_Sales_USD", "type": "quantitative", "format": "$,.0f"},
+        ],
+    },
+}
+
+# First colors of Vega's default categorical palette (tableau10)
+DONUT_COLORS = ['#4c78a8', '#f58518', '#e45756', '#72b7b2']
+DONUT_MAX_SLICES = len(DONUT_COLORS)
+
+def _mini_donut(labels, values, colors, outer_radius=120, inner_radius=50):
     """
-    Generates mock bike sales data (Granular).
-    We keep the date and price for each transaction to enable time-series analysis.
+    Renders a small donut chart as inline SVG.
+    Used for charts with only a few slices, where a full Vega-Lite render is overkill.
     """
-    num_rows = 1000
-    
-    # Define data fields
-    models = ['Speedster 3000', 'Trail King Pro', 'City Commuter E-3', 'Gravel Explorer', 'Aero Blade Race']
-    categories = ['Road', 'Mountain', 'City', 'Electric', 'BMX']
-    regions = ['North America', 'Europe', 'Asia', 'Oceania']
-    
-    data = {
-        'Bike_Model': [np.random.choice(models, p=[0.25, 0.20, 0.30, 0.15, 0.10]) for _ in range(num_rows)],
-        'Category': [random.choice(categories) for _ in range(num_rows)],
-        # Price is generated with noise to simulate fluctuations over time
-        'Price_USD': np.round(np.random.normal(loc=1800, scale=700, size=num_rows), -1).clip(500, 6000),
-        'Units_Sold': np.random.randint(1, 50, num_rows),
-        'Region': [random.choice(regions) for _ in range(num_rows)],
-        # Distribute sales randomly across the year
-        'Date': pd.to_datetime('2024-01-01') + pd.to_timedelta(np.random.randint(0, 365, num_rows), unit='D')
-    }
-    
-    granular_df = pd.DataFrame(data)
-    granular_df['Total_Sales_USD'] = granular_df['Price_USD'] * granular_df['Units_Sold']
-    
-    # Sort by date for better time-series charting
-    granular_df.sort_values('Date', inplace=True)
-    return granular_df
+    total = float(sum(values))
+    cx = cy = outer_radius + 10
+
+    def point(radius, angle):
+        # Angles run clockwise from 12 o'clock
+        return cx + radius * math.sin(angle), cy - radius * math.cos(angle)
+
+    slices, legend = [], []
+    angle = 0.0
+    for i, (label, value, color) in enumerate(zip(labels, values, colors)):
+        share = float(value) / total if total else 0.0
+        # "$" is written as an entity so st.markdown doesn't treat it as a LaTeX delimiter
+        tooltip = f"<title>{html.escape(str(label))}: &#36;{float(value):,.0f}</title>"
+        if share >= 1.0:
+            # A single full-circle arc has identical endpoints, so draw a ring instead
+            ring_radius = (outer_radius + inner_radius) / 2
+            slices.append(
+                f'<circle cx="{cx}" cy="{cy}" r="{ring_radius}" fill="none" '
+                f'stroke="{color}" stroke-width="{outer_radius - inner_radius}">{tooltip}</circle>'
+            )
+        elif share > 0.0:
+            end = angle + share * 2 * math.pi
+            large_arc = 1 if share > 0.5 else 0
+            x0, y0 = point(outer_radius, angle)
+            x1, y1 = point(outer_radius, end)
+            x2, y2 = point(inner_radius, end)
+            x3, y3 = point(inner_radius, angle)
+            slices.append(
+                f'<path d="M{x0:.2f},{y0:.2f} A{outer_radius},{outer_radius} 0 {large_arc} 1 {x1:.2f},{y1:.2f} '
+                f'L{x2:.2f},{y2:.2f} A{inner_radius},{inner_radius} 0 {large_arc} 0 {x3:.2f},{y3:.2f} Z" '
+                f'fill="{color}" stroke="white">{tooltip}</path>'
+            )
+            angle = end
+        legend_y = 20 + 22 * i
+        legend.append(
+            f'<rect x="{2 * cx + 10}" y="{legend_y - 10}" width="12" height="12" fill="{color}"/>'
+            f'<text x="{2 * cx + 28}" y="{legend_y}" font-size="12" font-family="sans-serif">'
+            f'{html.escape(str(label))}</text>'
+        )
+
+    width, height = 2 * cx + 160, 2 * cy
+    # viewBox + 100% width lets the donut shrink to fit narrow columns
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+        f'width="100%" style="max-width:{width}px" role="img">'
+        f'{"".join(slices)}{"".join(legend)}</svg>'
+    )
+
+# --- Chart Rendering ---
+def render_price_trend(price_trend):
+    if not price_trend.empty:
+        # Line Chart for Price Trend
+        st.vega_lite_chart(price_trend, PRICE_TREND_SPEC, use_container_width=True)
+    else:
+        st.warning("No data matches the current filter criteria for charting.")
+
+def render_units_chart(units_by_category):
+    if not units_by_category.empty:
+        # Bar Chart
+        st.vega_lite_chart(units_by_category, UNITS_BY_CATEGORY_SPEC, use_container_width=True)
+    else:
+        st.warning("No data for Units by Category.")
+
+def render_revenue_chart(revenue_by_region):
+    if revenue_by_region.empty:
+        st.warning("No data for Revenue by Region.")
+    elif len(revenue_by_region) <= DONUT_MAX_SLICES:
+        # Few slices: static SVG donut, largest share first. Colors follow Vega's
+        # nominal scale, which assigns the palette to the sorted region names.
+        ordered = revenue_by_region.sort_values('Total_Sales_USD', ascending=False)
+        domain = sorted(str(region) for region in ordered['Region'])
+        colors = [DONUT_COLORS[domain.index(str(region))] for region in ordered['Region']]
+        st.markdown("**Revenue Share by Region**")
+        st.markdown(
+            _mini_donut(ordered['Region'], ordered['Total_Sales_USD'], colors),
+            unsafe_allow_html=True
+        )
+    else:
+        # Pie/Donut Chart for Revenue Share
+        st.vega_lite_chart(revenue_by_region, REVENUE_BY_REGION_SPEC, use_container_width=True)
 
 # Load the granular data
-granular_sales_df = load_data()
+granular_sales_df = mock_sales()
+# Category options come straight from the categorical dtype, no scan needed
+CATEGORIES = tuple(granular_sales_df['Category'].cat.categories)
+price_min, price_max = price_bounds()
+sales_kpi_lookup = kpi_lookup()
 
 # --- Title and Introduction ---
 st.title("📈 Bikeroom Sales Dashboard: Price Trend Analysis")
@@ -60,30 +187,35 @@ st.sidebar.header("Filter Sales Data")
 # Filter 1: Category Multiselect
 selected_categories = st.sidebar.multiselect(
     'Select Bike Category',
-    options=granular_sales_df['Category'].unique(),
-    default=granular_sales_df['Category'].unique()
+    options=CATEGORIES,
+    default=CATEGORIES
 )
 
 # Filter 2: Price Slider (Now filtering on individual transaction price)
-min_price = st.sidebar.slider(
-    'Minimum Individual Sale Price ($)',
-    float(granular_sales_df['Price_USD'].min()),
-    float(granular_sales_df['Price_USD'].max()),
-    float(granular_sales_df['Price_USD'].min())
-)
+if price_max > price_min:
+    min_price = st.sidebar.slider(
+        'Minimum Individual Sale Price ($)',
+        price_min,
+        price_max,
+        price_min,
+        # Prices are multiples of $10, so this step loses no filtering resolution
+        # while letting nearby slider positions share one memoized aggregate
+        step=10.0
+    )
+else:
+    # st.slider needs min < max; with a single price there is nothing to filter
+    min_price = price_min
 
 # --- Data Filtering ---
-# Filter the granular data based on user selections
-filtered_df = granular_sales_df[
-    (granular_sales_df['Category'].isin(selected_categories)) &
-    (granular_sales_df['Price_USD'] >= min_price)
-]
+# Filtered rows and chart aggregates come from one memoized pass per filter state
+filtered_df, price_trend, units_by_category, revenue_by_region = aggregate(
+    frozenset(selected_categories), float(min_price)
+)
 
 # --- Main Content Layout ---
 
-# 1. KPIs (Calculated from the filtered granular data)
-total_revenue = filtered_df['Total_Sales_USD'].sum()
-total_units = filtered_df['Units_Sold'].sum()
+# 1. KPIs (Looked up from per-category suffix sums instead of summing the filtered rows)
+total_revenue, total_units, num_transactions = compute_kpis(sales_kpi_lookup, selected_categories, min_price)
 
 st.subheader("Key Performance Indicators (KPIs)")
 col_kpi_1, col_kpi_2, col_kpi_3 = st.columns(3)
@@ -93,7 +225,7 @@ col_kpi_2.metric("Total Units Sold", f"{total_units:,.0f}")
 col_kpi_3.metric(
     "Average Price per Unit", 
     f"${total_revenue / (total_units or 1):,.2f}",
-    delta=f"Based on {len(filtered_df)} transactions"
+    delta=f"Based on {num_transactions} transactions"
 )
 
 st.markdown("---")
@@ -102,27 +234,7 @@ st.markdown("---")
 st.header("Price Trend Analysis")
 st.subheader("Monthly Average Price per Unit by Category")
 
-if not filtered_df.empty:
-    # Aggregate filtered data by month and category to get mean price
-    df_time_series = filtered_df.set_index('Date')
-    
-    # Resample monthly and calculate the mean price
-    price_trend = df_time_series.groupby('Category')['Price_USD'].resample('M').mean().reset_index()
-    price_trend.rename(columns={'Price_USD': 'Avg_Price'}, inplace=True)
-
-    # Altair Line Chart for Price Trend
-    chart_price = alt.Chart(price_trend).mark_line(point=True).encode(
-        x=alt.X('Date', axis=alt.Axis(title='Date', format='%Y-%m')),
-        y=alt.Y('Avg_Price', axis=alt.Axis(title='Average Price (USD)', format='$,.0f')),
-        color='Category',
-        tooltip=['Date', 'Category', alt.Tooltip('Avg_Price', format='$,.2f')]
-    ).properties(
-        title='Average Monthly Price Trend'
-    ).interactive() # Add interactive for zoom/pan
-
-    st.altair_chart(chart_price, use_container_width=True)
-else:
-    st.warning("No data matches the current filter criteria for charting.")
+render_price_trend(price_trend)
 
 
 st.markdown("---")
@@ -135,54 +247,18 @@ col_viz_1, col_viz_2 = st.columns(2)
 
 with col_viz_1:
     st.subheader("Total Units Sold by Bike Category")
-    
-    if not filtered_df.empty:
-        # Aggregate on the fly
-        units_by_category = filtered_df.groupby('Category')['Units_Sold'].sum().reset_index()
-        
-        # Altair Bar Chart
-        chart_units = alt.Chart(units_by_category).mark_bar().encode(
-            x=alt.X('Category', sort='-y'),
-            y=alt.Y('Units_Sold', title='Total Units Sold'),
-            tooltip=['Category', 'Units_Sold']
-        ).properties(
-            height=300
-        ).interactive()
-        
-        st.altair_chart(chart_units, use_container_width=True)
-    else:
-        st.warning("No data for Units by Category.")
+    render_units_chart(units_by_category)
 
 with col_viz_2:
     st.subheader("Revenue Distribution by Region")
-    
-    if not filtered_df.empty:
-        # Aggregate on the fly
-        revenue_by_region = filtered_df.groupby('Region')['Total_Sales_USD'].sum().reset_index()
-        
-        # Altair Pie/Donut Chart for Revenue Share
-        base = alt.Chart(revenue_by_region).encode(
-            theta=alt.Theta("Total_Sales_USD:Q", stack=True)
-        )
-        
-        pie = base.mark_arc(outerRadius=120, innerRadius=50).encode(
-            color=alt.Color("Region:N"),
-            order=alt.Order("Total_Sales_USD:Q", sort="descending"),
-            tooltip=["Region", alt.Tooltip('Total_Sales_USD', format='$,.0f')]
-        ).properties(
-            title='Revenue Share by Region'
-        )
-        
-        st.altair_chart(pie, use_container_width=True)
-    else:
-        st.warning("No data for Revenue by Region.")
+    render_revenue_chart(revenue_by_region)
 
 
 # 4. Detailed Data Table
 st.header("Detailed Sales Transactions")
 st.markdown(f"**Showing {len(filtered_df)} individual transactions** matching your filters.")
-# Display the granular data table
-st.dataframe(filtered_df, use_container_width=True)
+# Display the granular data table (fixed height so the grid virtualizes rows)
+st.dataframe(filtered_df, use_container_width=True, height=400)
 
 
 # --- Deployment Instructions Footer ---